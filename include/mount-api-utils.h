@@ -204,5 +204,118 @@ static inline int fspick(int dfd, const char *pathname, unsigned int flags)
 #endif
 
 #endif /* HAVE_MOUNTFD_API && HAVE_LINUX_MOUNT_H */
+
+/*
+ * statmount(2) and listmount(2) -- Linux v6.8
+ *
+ * The structures are defined locally with an ul_ prefix, so the header is
+ * usable with old kernel headers and old glibc as well. Whether the running
+ * kernel supports the syscalls has to be checked at runtime (ENOSYS).
+ */
+#ifdef __linux__
+
+#include <stdint.h>
+#include <unistd.h>
+#include <sys/syscall.h>
+
+/* the syscall numbers come from asm-generic and are the same everywhere */
+#ifndef __NR_statmount
+# define __NR_statmount  457
+#endif
+#ifndef __NR_listmount
+# define __NR_listmount  458
+#endif
+
+#ifndef LSMT_ROOT
+# define LSMT_ROOT		0xffffffffffffffff	/* root mount */
+#endif
+
+#ifndef MNT_ID_REQ_SIZE_VER0
+# define MNT_ID_REQ_SIZE_VER0	24	/* sizeof first published struct */
+#endif
+
+#ifndef STATMOUNT_SB_BASIC
+# define STATMOUNT_SB_BASIC		0x00000001U /* want/got sb_... */
+# define STATMOUNT_MNT_BASIC		0x00000002U /* want/got mnt_... */
+# define STATMOUNT_PROPAGATE_FROM	0x00000004U /* want/got propagate_from */
+# define STATMOUNT_MNT_ROOT		0x00000008U /* want/got mnt_root  */
+# define STATMOUNT_MNT_POINT		0x00000010U /* want/got mnt_point */
+# define STATMOUNT_FS_TYPE		0x00000020U /* want/got fs_type */
+#endif
+
+#ifndef STATMOUNT_SB_SOURCE
+# define STATMOUNT_MNT_NS_ID		0x00000040U /* want/got mnt_ns_id */
+# define STATMOUNT_MNT_OPTS		0x00000080U /* want/got mnt_opts */
+# define STATMOUNT_FS_SUBTYPE		0x00000100U /* want/got fs_subtype */
+# define STATMOUNT_SB_SOURCE		0x00000200U /* want/got sb_source */
+#endif
+
+struct ul_mnt_id_req {
+	uint32_t size;
+	uint32_t spare;
+	uint64_t mnt_id;
+	uint64_t param;
+};
+
+struct ul_statmount {
+	uint32_t size;		/* total size, including strings */
+	uint32_t mnt_opts;	/* [str] mount options of the mount */
+	uint64_t mask;		/* what results were written */
+	uint32_t sb_dev_major;	/* devid of superblock */
+	uint32_t sb_dev_minor;
+	uint64_t sb_magic;	/* ..._SUPER_MAGIC */
+	uint32_t sb_flags;	/* SB_{RDONLY,SYNCHRONOUS,DIRSYNC,LAZYTIME} */
+	uint32_t fs_type;	/* [str] filesystem type */
+	uint64_t mnt_id;	/* unique id of mount */
+	uint64_t mnt_parent_id;	/* unique id of parent (for root == mnt_id) */
+	uint32_t mnt_id_old;	/* as seen in proc/.../mountinfo */
+	uint32_t mnt_parent_id_old;
+	uint64_t mnt_attr;	/* MOUNT_ATTR_... */
+	uint64_t mnt_propagation;	/* MS_{SHARED,SLAVE,PRIVATE,UNBINDABLE} */
+	uint64_t mnt_peer_group;	/* ID of shared peer group */
+	uint64_t mnt_master;	/* mount receives propagation from this ID */
+	uint64_t propagate_from;	/* propagation from in current namespace */
+	uint32_t mnt_root;	/* [str] root of mount relative to root of fs */
+	uint32_t mnt_point;	/* [str] mountpoint relative to current root */
+	uint64_t mnt_ns_id;	/* ID of the mount namespace */
+	uint32_t fs_subtype;	/* [str] subtype of fs_type (if any) */
+	uint32_t sb_source;	/* [str] source string of the mount */
+	uint32_t opt_num;	/* number of fs options */
+	uint32_t opt_array;	/* [str] array of nul terminated fs options */
+	uint32_t opt_sec_num;	/* number of security options */
+	uint32_t opt_sec_array;	/* [str] array of nul terminated security options */
+	uint64_t __spare2[46];
+	char str[];		/* variable size part containing strings */
+};
+
+static inline int ul_statmount(uint64_t mnt_id, uint64_t mask,
+			       struct ul_statmount *buf, size_t bufsize,
+			       unsigned int flags)
+{
+	struct ul_mnt_id_req req = {
+		.size = MNT_ID_REQ_SIZE_VER0,
+		.mnt_id = mnt_id,
+		.param = mask
+	};
+
+	return syscall(__NR_statmount, &req, buf, bufsize, flags);
+}
+
+static inline ssize_t ul_listmount(uint64_t mnt_id, uint64_t last_mnt_id,
+				   uint64_t list[], size_t num,
+				   unsigned int flags)
+{
+	struct ul_mnt_id_req req = {
+		.size = MNT_ID_REQ_SIZE_VER0,
+		.mnt_id = mnt_id,
+		.param = last_mnt_id
+	};
+
+	return syscall(__NR_listmount, &req, list, num, flags);
+}
+
+#define HAVE_STATMOUNT_API 1
+
+#endif /* __linux__ */
 #endif /* UTIL_LINUX_MOUNT_API_UTILS */
 
@@ -111,6 +111,9 @@ static int Context_init(ContextObjext *self, PyObject *args, PyObject *kwds)
 		return -1;
 	}
 
+	/* use the process-wide tags cache rather than a private one */
+	mnt_context_set_cache(self->cxt, pymnt_get_shared_cache());
+
 	if (source && (rc = mnt_context_set_source(self->cxt, source))) {
 		UL_RaiseExc(-rc);
 		return -1;
@@ -655,6 +658,27 @@ static PyObject *Context_get_user_mflags(ContextObjext *self)
 	return result;
 
 }
+#define Context_reset_HELP "reset()\n\n" \
+	"Resets all information in the context that is directly related to\n" \
+	"the latest mount (spec, source, target, mount options, ...), so the\n" \
+	"context can be reused for another operation. The match patterns, the\n" \
+	"cached fstab and the cached canonicalized paths and tags are NOT\n" \
+	"reset, which makes a recycled context much cheaper than a new one.\n" \
+	"\n" \
+	"Returns self or raises an exception in case of an error."
+static PyObject *Context_reset(ContextObjext *self)
+{
+	int rc;
+
+	/* the reset drops cxt->fs and the cached mount table, drop the
+	 * references to their Python wrappers as well (see Context_dealloc) */
+	Py_XDECREF(mnt_context_get_fs_userdata(self->cxt));
+	Py_XDECREF(mnt_context_get_mtab_userdata(self->cxt));
+
+	rc = mnt_reset_context(self->cxt);
+	return rc ? UL_RaiseExc(-rc) : UL_IncRef(self);
+}
+
 #define Context_reset_status_HELP "reset_status()\n\n" \
 	"Resets mount(2) and mount.type statuses, so Cxt.do_mount() or\n" \
 	"Cxt.do_umount() could be again called with the same settings.\n" \
@@ -1120,6 +1144,7 @@ static PyGetSetDef Context_getseters[] = {
 };
 static PyMethodDef Context_methods[] = {
 	{"find_umount_fs",	(PyCFunction)Context_find_umount_fs, METH_VARARGS|METH_KEYWORDS, Context_find_umount_fs_HELP},
+	{"reset",		(PyCFunction)Context_reset, METH_NOARGS, Context_reset_HELP},
 	{"reset_status",	(PyCFunction)Context_reset_status, METH_NOARGS, Context_reset_status_HELP},
 	{"helper_executed",	(PyCFunction)Context_helper_executed, METH_NOARGS, Context_helper_executed_HELP},
 	{"init_helper",	(PyCFunction)Context_init_helper, METH_VARARGS|METH_KEYWORDS, Context_init_helper_HELP},
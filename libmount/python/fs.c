@@ -93,6 +93,59 @@ static void _dump_debug_string(const char *lead, const char *s, char quote)
 		PySys_WriteStdout("\n");
 }
 
+/* Same dump as Fs.print_debug(), but written to a stdio stream; used by
+ * Tab.print_debug_all() to render a whole table into one buffer. */
+void pymnt_fs_print_debug_stream(struct libmnt_fs *fs, FILE *f)
+{
+	fprintf(f, "------ fs: %p\n", fs);
+	fprintf(f, "source: %s\n", mnt_fs_get_source(fs));
+	fprintf(f, "target: %s\n", mnt_fs_get_target(fs));
+	fprintf(f, "fstype: %s\n", mnt_fs_get_fstype(fs));
+
+	if (mnt_fs_get_options(fs))
+		fprintf(f, "optstr: %s\n", mnt_fs_get_options(fs));
+	if (mnt_fs_get_vfs_options(fs))
+		fprintf(f, "VFS-optstr: %s\n", mnt_fs_get_vfs_options(fs));
+	if (mnt_fs_get_fs_options(fs))
+		fprintf(f, "FS-opstr: %s\n", mnt_fs_get_fs_options(fs));
+	if (mnt_fs_get_user_options(fs))
+		fprintf(f, "user-optstr: %s\n", mnt_fs_get_user_options(fs));
+	if (mnt_fs_get_optional_fields(fs))
+		fprintf(f, "optional-fields: '%s'\n", mnt_fs_get_optional_fields(fs));
+	if (mnt_fs_get_attributes(fs))
+		fprintf(f, "attributes: %s\n", mnt_fs_get_attributes(fs));
+
+	if (mnt_fs_get_root(fs))
+		fprintf(f, "root:   %s\n", mnt_fs_get_root(fs));
+
+	if (mnt_fs_get_swaptype(fs))
+		fprintf(f, "swaptype: %s\n", mnt_fs_get_swaptype(fs));
+	if (mnt_fs_get_size(fs))
+		fprintf(f, "size: %jd\n", (intmax_t) mnt_fs_get_size(fs));
+	if (mnt_fs_get_usedsize(fs))
+		fprintf(f, "usedsize: %jd\n", (intmax_t) mnt_fs_get_usedsize(fs));
+	if (mnt_fs_get_priority(fs))
+		fprintf(f, "priority: %d\n", mnt_fs_get_priority(fs));
+
+	if (mnt_fs_get_bindsrc(fs))
+		fprintf(f, "bindsrc: %s\n", mnt_fs_get_bindsrc(fs));
+	if (mnt_fs_get_freq(fs))
+		fprintf(f, "freq:   %d\n", mnt_fs_get_freq(fs));
+	if (mnt_fs_get_passno(fs))
+		fprintf(f, "pass:   %d\n", mnt_fs_get_passno(fs));
+	if (mnt_fs_get_id(fs))
+		fprintf(f, "id:     %d\n", mnt_fs_get_id(fs));
+	if (mnt_fs_get_parent_id(fs))
+		fprintf(f, "parent: %d\n", mnt_fs_get_parent_id(fs));
+	if (mnt_fs_get_devno(fs))
+		fprintf(f, "devno:  %d:%d\n", major(mnt_fs_get_devno(fs)),
+						minor(mnt_fs_get_devno(fs)));
+	if (mnt_fs_get_tid(fs))
+		fprintf(f, "tid:    %d\n", mnt_fs_get_tid(fs));
+	if (mnt_fs_get_comment(fs))
+		fprintf(f, "comment: '%s'\n", mnt_fs_get_comment(fs));
+}
+
 #define Fs_print_debug_HELP "print_debug()\n\n"
 static PyObject *Fs_print_debug(FsObject *self)
 {
@@ -181,6 +234,7 @@ static PyObject *Fs_get_source(FsObject *self)
 
 static int Fs_set_source(FsObject *self, PyObject *value, void *closure __attribute__((unused)))
 {
+	struct libmnt_table *tb = NULL;
 	char *source = NULL;
 	int rc = 0;
 
@@ -196,6 +250,8 @@ static int Fs_set_source(FsObject *self, PyObject *value, void *closure __attrib
 		UL_RaiseExc(-rc);
 		return -1;
 	}
+	if (mnt_fs_get_table(self->fs, &tb) == 0)
+		pymnt_table_lookup_reset(tb);
 	return 0;
 }
 
@@ -236,6 +292,7 @@ static PyObject *Fs_get_target(FsObject *self)
 
 static int Fs_set_target(FsObject *self, PyObject *value, void *closure __attribute__((unused)))
 {
+	struct libmnt_table *tb = NULL;
 	char *target = NULL;
 	int rc = 0;
 
@@ -251,12 +308,23 @@ static int Fs_set_target(FsObject *self, PyObject *value, void *closure __attrib
 		UL_RaiseExc(-rc);
 		return -1;
 	}
+	if (mnt_fs_get_table(self->fs, &tb) == 0)
+		pymnt_table_lookup_reset(tb);
 	return 0;
 }
 
 static PyObject *Fs_get_fstype(FsObject *self)
 {
-	return PyObjectResultStr(mnt_fs_get_fstype(self->fs));
+	const char *fstype = mnt_fs_get_fstype(self->fs);
+
+#if PY_MAJOR_VERSION >= 3
+	/* There are only a handful of distinct fstypes even in huge mount
+	 * tables; interned, all Fs objects share one string object per type
+	 * and equality checks short-circuit on identity. */
+	if (fstype)
+		return PyUnicode_InternFromString(fstype);
+#endif
+	return PyObjectResultStr(fstype);
 }
 
 static int Fs_set_fstype(FsObject *self, PyObject *value,
@@ -747,6 +815,48 @@ static PyGetSetDef Fs_getseters[] = {
 	{NULL}
 };
 
+/*
+ * Fast path for the attributes read in parser loops ("for fs in tb:" reading
+ * fs.source etc.). The generic lookup hashes the name and walks the type's
+ * method resolution order for every single access; the hot names are
+ * recognized here and dispatched straight to the getter. Everything else
+ * (including subclasses, which may override the properties) takes the
+ * generic path.
+ */
+static PyObject *Fs_getattro(PyObject *self, PyObject *name)
+{
+#if PY_MAJOR_VERSION >= 3
+	if (Py_TYPE(self) == &FsType
+	    && PyUnicode_Check(name)
+	    && PyUnicode_KIND(name) == PyUnicode_1BYTE_KIND) {
+		FsObject *fs = (FsObject *) self;
+		const char *s = (const char *) PyUnicode_1BYTE_DATA(name);
+
+		switch (*s) {
+		case 'f':
+			if (strcmp(s, "fstype") == 0)
+				return Fs_get_fstype(fs);
+			break;
+		case 'o':
+			if (strcmp(s, "options") == 0)
+				return Fs_get_options(fs);
+			break;
+		case 's':
+			if (strcmp(s, "source") == 0)
+				return Fs_get_source(fs);
+			break;
+		case 't':
+			if (strcmp(s, "target") == 0)
+				return Fs_get_target(fs);
+			break;
+		default:
+			break;
+		}
+	}
+#endif
+	return PyObject_GenericGetAttr(self, name);
+}
+
 static PyObject *Fs_repr(FsObject *self)
 {
 	const char *src = mnt_fs_get_source(self->fs),
@@ -836,6 +946,7 @@ PyTypeObject FsType = {
 	.tp_basicsize = sizeof(FsObject),
 	.tp_dealloc = (destructor)Fs_destructor,
 	.tp_repr = (reprfunc)Fs_repr,
+	.tp_getattro = Fs_getattro,
 	.tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE,
 	.tp_doc = Fs_HELP,
 	.tp_methods = Fs_methods,
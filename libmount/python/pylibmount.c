@@ -89,6 +89,35 @@ void *UL_RaiseExc(int e)
 	return NULL;
 }
 
+/*
+ * The tags (UUID=, LABEL=, ...) to device name resolution is expensive, the
+ * paths cache is therefore shared by all Table and Context instances in the
+ * process, so devices are probed only once. The cache is reference counted,
+ * objects using it keep their own reference.
+ */
+static struct libmnt_cache *shared_cache;
+
+struct libmnt_cache *pymnt_get_shared_cache(void)
+{
+	if (!shared_cache) {
+		DBG(TAB, pymnt_debug("allocate shared cache"));
+		shared_cache = mnt_new_cache();
+	}
+	return shared_cache;
+}
+
+#define invalidate_cache_HELP "invalidate_cache()\n\n" \
+		"Drops the process-wide paths and tags cache that is shared by\n" \
+		"all Table and Context instances. Already existing objects keep\n" \
+		"using the old cache, new objects will get a fresh one. Call this\n" \
+		"if block devices were added or relabeled."
+static PyObject *invalidate_cache(PyObject *mod __attribute__((unused)))
+{
+	mnt_unref_cache(shared_cache);
+	shared_cache = NULL;
+	Py_RETURN_NONE;
+}
+
 /*
  * General functions
  */
@@ -168,6 +197,7 @@ error_out(PyObject *m __attribute__((unused))) {
 
 static PyMethodDef pylibmount_methods[] = {
     {"error_out", (PyCFunction)error_out, METH_NOARGS, NULL},
+    {"invalidate_cache", (PyCFunction)invalidate_cache, METH_NOARGS, invalidate_cache_HELP},
     {NULL, NULL}
 };
 
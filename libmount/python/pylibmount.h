@@ -73,17 +73,36 @@ typedef struct {
 extern PyTypeObject FsType;
 
 extern PyObject *PyObjectResultFs(struct libmnt_fs *fs);
+extern void pymnt_fs_print_debug_stream(struct libmnt_fs *fs, FILE *f);
 extern void FS_AddModuleObject(PyObject *mod);
 
 /*
  * tab.c
  */
+
+/* number of remembered failed Table.find_*() lookups */
+#define PYMNT_NEG_CACHE_SZ	16
+
+struct pymnt_negent {
+	char				*key;
+	int				kind;
+};
+
+struct pymnt_pairidx;
+
 typedef struct {
 	PyObject_HEAD
 
 	struct libmnt_table		*tab;
 	struct libmnt_iter		*iter;
 	PyObject			*errcb;
+
+	/* ring of recent failed lookups, see neg_cache_lookup() */
+	struct pymnt_negent		neg[PYMNT_NEG_CACHE_SZ];
+	size_t				neg_next;
+
+	/* optional (source, target) hash index, see Table.build_index() */
+	struct pymnt_pairidx		*pairidx;
 } TableObject;
 
 extern PyTypeObject TableType;
@@ -94,6 +113,7 @@ extern void Table_unref(struct libmnt_table *tab);
 extern void Table_AddModuleObject(PyObject *mod);
 
 extern int pymnt_table_parser_errcb(struct libmnt_table *tb, const char *filename, int line);
+extern void pymnt_table_lookup_reset(struct libmnt_table *tb);
 
 #ifdef __linux__
 
@@ -120,6 +140,8 @@ extern PyObject *LibmountError;
 extern PyObject *UL_IncRef(void *killme);
 extern void *UL_RaiseExc(int e);
 
+extern struct libmnt_cache *pymnt_get_shared_cache(void);
+
 extern PyObject *PyObjectResultInt(int i);
 extern PyObject *PyObjectResultStr(const char *s);
 
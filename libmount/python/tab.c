@@ -20,10 +20,192 @@
  */
 #include "pylibmount.h"
 
+#include <fcntl.h>
+#include <sys/mman.h>
+
+#include "mount-api-utils.h"
+
 static PyMemberDef Table_members[] = {
 	{ NULL }
 };
 
+#ifndef MAP_POPULATE
+# define MAP_POPULATE 0
+#endif
+
+/*
+ * Negative lookup cache.
+ *
+ * Table.find_source(), find_target() and find_pair() walk the whole fs list
+ * on a miss. Callers probing many candidate paths (e.g. mount unit lookups)
+ * mostly generate misses, each paying the full O(N) walk. The table object
+ * remembers the last PYMNT_NEG_CACHE_SZ failed lookups, so a repeated miss
+ * returns immediately. The ring is dropped whenever the table is modified.
+ */
+enum {
+	PYMNT_NEG_SOURCE,
+	PYMNT_NEG_TARGET,
+	PYMNT_NEG_PAIR
+};
+
+static int neg_cache_lookup(TableObject *self, int kind, const char *key)
+{
+	size_t i;
+
+	for (i = 0; i < PYMNT_NEG_CACHE_SZ; i++) {
+		if (self->neg[i].key && self->neg[i].kind == kind
+		    && strcmp(self->neg[i].key, key) == 0)
+			return 1;
+	}
+	return 0;
+}
+
+static void neg_cache_add(TableObject *self, int kind, const char *key)
+{
+	struct pymnt_negent *e = &self->neg[self->neg_next];
+
+	free(e->key);
+	e->key = strdup(key);
+	if (!e->key)
+		return;			/* cache is best-effort only */
+	e->kind = kind;
+	self->neg_next = (self->neg_next + 1) % PYMNT_NEG_CACHE_SZ;
+}
+
+static void neg_cache_reset(TableObject *self)
+{
+	size_t i;
+
+	for (i = 0; i < PYMNT_NEG_CACHE_SZ; i++) {
+		free(self->neg[i].key);
+		self->neg[i].key = NULL;
+	}
+	self->neg_next = 0;
+}
+
+/*
+ * Optional hash index over the (source, target) pairs of a table, built on
+ * demand by Table.build_index(). find_pair() is a linear walk comparing both
+ * strings per entry; with thousands of mountinfo entries and many lookups
+ * the index answers exact-string matches in O(1). Lookups that don't hit
+ * the index (e.g. paths that only match after canonicalization) still fall
+ * back to the full walk. Note that the shortcut is exact-string only: when
+ * several entries match the same pair (say "UUID=x /" before "/dev/sda1 /"),
+ * mnt_table_find_pair() may prefer an earlier canonicalized match while the
+ * index returns the exact-string entry. The index is dropped whenever the
+ * table is modified.
+ */
+#define PYMNT_FNV1A_INIT	0x811c9dc5U
+
+struct pymnt_pairent {
+	struct libmnt_fs	*first;		/* first match, forward order */
+	struct libmnt_fs	*last;		/* last match, forward order */
+};
+
+struct pymnt_pairidx {
+	size_t			cap;		/* power of two */
+	struct pymnt_pairent	slots[];
+};
+
+static uint32_t pairidx_hash(const char *source, const char *target)
+{
+	uint32_t h = PYMNT_FNV1A_INIT;
+	const char *s;
+
+	for (s = source; *s; s++) {
+		h ^= (unsigned char) *s;
+		h *= 0x01000193;
+	}
+	h ^= (h << 16) | (h >> 16);		/* separate the two fields */
+	for (s = target; *s; s++) {
+		h ^= (unsigned char) *s;
+		h *= 0x01000193;
+	}
+	return h;
+}
+
+/* returns the slot of the pair, or the empty slot where it belongs */
+static struct pymnt_pairent *pairidx_slot(struct pymnt_pairidx *ix,
+					  const char *source, const char *target)
+{
+	size_t i = pairidx_hash(source, target) & (ix->cap - 1);
+
+	while (ix->slots[i].first) {
+		struct libmnt_fs *fs = ix->slots[i].first;
+
+		if (strcmp(mnt_fs_get_source(fs), source) == 0
+		    && strcmp(mnt_fs_get_target(fs), target) == 0)
+			break;
+		i = (i + 1) & (ix->cap - 1);
+	}
+	return &ix->slots[i];
+}
+
+static void pairidx_free(TableObject *self)
+{
+	free(self->pairidx);
+	self->pairidx = NULL;
+}
+
+/* any modification of the table invalidates the lookup accelerators */
+static void table_lookup_reset(TableObject *self)
+{
+	neg_cache_reset(self);
+	pairidx_free(self);
+}
+
+/* called from fs.c when source/target of an entry changes in place, which
+ * the table-level modification hooks don't see */
+void pymnt_table_lookup_reset(struct libmnt_table *tb)
+{
+	TableObject *to = tb ? mnt_table_get_userdata(tb) : NULL;
+
+	if (to)
+		table_lookup_reset(to);
+}
+
+/*
+ * Maps the whole file and parses it from memory, so the parser does not
+ * read() the file line by line. Returns 1 if the file cannot be mapped
+ * (e.g. empty regular file or procfs) and the caller should fall back to
+ * mnt_table_parse_file().
+ */
+static int table_parse_file_mmap(struct libmnt_table *tb, const char *path)
+{
+	struct stat st;
+	void *data;
+	FILE *f;
+	int fd, rc;
+
+	fd = open(path, O_RDONLY|O_CLOEXEC);
+	if (fd < 0)
+		return 1;
+
+	if (fstat(fd, &st) != 0 || !S_ISREG(st.st_mode) || st.st_size == 0) {
+		close(fd);
+		return 1;	/* procfs files have zero st_size */
+	}
+
+	data = mmap(NULL, st.st_size, PROT_READ,
+		    MAP_PRIVATE | MAP_POPULATE, fd, 0);
+	close(fd);
+	if (data == MAP_FAILED)
+		return 1;
+
+	f = fmemopen(data, st.st_size, "r");
+	if (!f) {
+		munmap(data, st.st_size);
+		return 1;
+	}
+
+	DBG(TAB, pymnt_debug_h(tb, "parsing mmaped %s", path));
+
+	rc = mnt_table_parse_stream(tb, f, path);
+	fclose(f);
+	munmap(data, st.st_size);
+	return rc;
+}
+
 static int Table_set_parser_errcb(TableObject *self, PyObject *func,
 				  void *closure __attribute__((unused)))
 {
@@ -211,11 +393,36 @@ static PyObject *Table_find_pair(TableObject *self, PyObject *args, PyObject *kw
 	char *target;
 	int direction = MNT_ITER_BACKWARD;
 
+	struct libmnt_fs *fs;
+	char *key = NULL;
+
 	if (!PyArg_ParseTupleAndKeywords(args, kwds, "ss|i", kwlist, &source, &target, &direction)) {
 		PyErr_SetString(PyExc_TypeError, ARG_ERR);
 		return NULL;
 	}
-	return PyObjectResultFs(mnt_table_find_pair(self->tab, source, target, direction));
+
+	if (self->pairidx) {
+		struct pymnt_pairent *e = pairidx_slot(self->pairidx, source, target);
+
+		if (e->first)
+			return PyObjectResultFs(direction == MNT_ITER_FORWARD ?
+						e->first : e->last);
+		/* not an exact-string match; try the canonicalizing walk below */
+	}
+
+	/* a miss is direction independent -- either direction walks the same set */
+	if (asprintf(&key, "%s\n%s", source, target) < 0)
+		key = NULL;
+	if (key && neg_cache_lookup(self, PYMNT_NEG_PAIR, key)) {
+		free(key);
+		return PyObjectResultFs(NULL);
+	}
+
+	fs = mnt_table_find_pair(self->tab, source, target, direction);
+	if (!fs && key)
+		neg_cache_add(self, PYMNT_NEG_PAIR, key);
+	free(key);
+	return PyObjectResultFs(fs);
 }
 
 #define Table_find_source_HELP "find_source(source, [direction])\n\n" \
@@ -226,11 +433,20 @@ static PyObject *Table_find_source(TableObject *self, PyObject *args, PyObject *
 	char *source;
 	int direction = MNT_ITER_BACKWARD;
 
+	struct libmnt_fs *fs;
+
 	if (!PyArg_ParseTupleAndKeywords(args, kwds, "s|i", kwlist, &source, &direction)) {
 		PyErr_SetString(PyExc_TypeError, ARG_ERR);
 		return NULL;
 	}
-	return PyObjectResultFs(mnt_table_find_source(self->tab, source, direction));
+
+	if (neg_cache_lookup(self, PYMNT_NEG_SOURCE, source))
+		return PyObjectResultFs(NULL);
+
+	fs = mnt_table_find_source(self->tab, source, direction);
+	if (!fs)
+		neg_cache_add(self, PYMNT_NEG_SOURCE, source);
+	return PyObjectResultFs(fs);
 }
 
 #define Table_find_target_HELP "find_target(target, [direction])\n\n" \
@@ -246,11 +462,20 @@ static PyObject *Table_find_target(TableObject *self, PyObject *args, PyObject *
 	char *target;
 	int direction = MNT_ITER_BACKWARD;
 
+	struct libmnt_fs *fs;
+
 	if (!PyArg_ParseTupleAndKeywords(args, kwds, "s|i", kwlist, &target, &direction)) {
 		PyErr_SetString(PyExc_TypeError, ARG_ERR);
 		return NULL;
 	}
-	return PyObjectResultFs(mnt_table_find_target(self->tab, target, direction));
+
+	if (neg_cache_lookup(self, PYMNT_NEG_TARGET, target))
+		return PyObjectResultFs(NULL);
+
+	fs = mnt_table_find_target(self->tab, target, direction);
+	if (!fs)
+		neg_cache_add(self, PYMNT_NEG_TARGET, target);
+	return PyObjectResultFs(fs);
 }
 
 #define Table_find_srcpath_HELP "find_srcpath(srcpath, [direction])\n\n" \
@@ -331,23 +556,33 @@ static PyObject *Table_is_fs_mounted(TableObject *self, PyObject *args, PyObject
 	return PyBool_FromLong(mnt_table_is_fs_mounted(self->tab, fs->fs));
 }
 
-#define Table_parse_file_HELP "parse_file(file)\n\n" \
+#define Table_parse_file_HELP "parse_file(file, use_mmap=False)\n\n" \
 		"Parses whole table (e.g. /etc/mtab) and appends new records to the tab.\n" \
 		"\n" \
+		"If use_mmap is True then the file is mapped to memory and parsed in one\n" \
+		"go rather than read line by line. The mmap(2) based fast path silently\n" \
+		"falls back to the regular parser for files where the file size is\n" \
+		"unknown (e.g. /proc/self/mountinfo).\n" \
+		"\n" \
 		"The libmount parser ignores broken (syntax error) lines, these lines are\n" \
 		"reported to caller by errcb() function (see Tab.parser_errcb).\n" \
 		"\n" \
 		"Returns self or raises an exception in case of an error."
 static PyObject *Table_parse_file(TableObject *self, PyObject* args, PyObject *kwds)
 {
-	int rc;
+	int rc = 1;
+	int use_mmap = 0;
 	char *file = NULL;
-	char *kwlist[] = {"file", NULL};
-	if (!PyArg_ParseTupleAndKeywords(args, kwds, "s", kwlist, &file)) {
+	char *kwlist[] = {"file", "use_mmap", NULL};
+	if (!PyArg_ParseTupleAndKeywords(args, kwds, "s|i", kwlist, &file, &use_mmap)) {
 		PyErr_SetString(PyExc_TypeError, ARG_ERR);
 		return NULL;
 	}
-	rc = mnt_table_parse_file(self->tab, file);
+	table_lookup_reset(self);
+	if (use_mmap)
+		rc = table_parse_file_mmap(self->tab, file);
+	if (rc > 0)
+		rc = mnt_table_parse_file(self->tab, file);
 	return rc ? UL_RaiseExc(-rc) : UL_IncRef(self);
 }
 
@@ -368,6 +603,7 @@ static PyObject *Table_parse_fstab(TableObject *self, PyObject* args, PyObject *
 		PyErr_SetString(PyExc_TypeError, ARG_ERR);
 		return NULL;
 	}
+	table_lookup_reset(self);
 	rc = mnt_table_parse_fstab(self->tab, fstab);
 	return rc ? UL_RaiseExc(-rc) : UL_IncRef(self);
 }
@@ -389,6 +625,7 @@ static PyObject *Table_parse_mtab(TableObject *self, PyObject* args, PyObject *k
 		PyErr_SetString(PyExc_TypeError, ARG_ERR);
 		return NULL;
 	}
+	table_lookup_reset(self);
 	rc = mnt_table_parse_mtab(self->tab, mtab);
 	return rc ? UL_RaiseExc(-rc) : UL_IncRef(self);
 }
@@ -410,6 +647,7 @@ static PyObject *Table_parse_dir(TableObject *self, PyObject* args, PyObject *kw
 		PyErr_SetString(PyExc_TypeError, ARG_ERR);
 		return NULL;
 	}
+	table_lookup_reset(self);
 	rc = mnt_table_parse_dir(self->tab, dir);
 	return rc ? UL_RaiseExc(-rc) : UL_IncRef(self);
 }
@@ -426,10 +664,144 @@ static PyObject *Table_parse_swaps(TableObject *self, PyObject* args, PyObject *
 		PyErr_SetString(PyExc_TypeError, ARG_ERR);
 		return NULL;
 	}
+	table_lookup_reset(self);
 	rc = mnt_table_parse_swaps(self->tab, swaps);
 	return rc ? UL_RaiseExc(-rc) : UL_IncRef(self);
 }
 
+#ifdef HAVE_STATMOUNT_API
+
+#define PYMNT_STATMOUNT_BUFSIZ	(32 * 1024)
+
+static int statmount_fetch(uint64_t id, struct ul_statmount **res)
+{
+	size_t bufsiz = PYMNT_STATMOUNT_BUFSIZ;
+	struct ul_statmount *sm = NULL;
+	uint64_t mask = STATMOUNT_SB_BASIC | STATMOUNT_MNT_BASIC |
+			STATMOUNT_MNT_ROOT | STATMOUNT_MNT_POINT |
+			STATMOUNT_FS_TYPE | STATMOUNT_SB_SOURCE;
+
+	do {
+		void *tmp = realloc(sm, bufsiz);
+
+		if (!tmp) {
+			free(sm);
+			return -ENOMEM;
+		}
+		sm = tmp;
+
+		if (ul_statmount(id, mask, sm, bufsiz, 0) == 0) {
+			*res = sm;
+			return 0;
+		}
+		if ((errno == EINVAL || errno == EOPNOTSUPP)
+		    && (mask & STATMOUNT_SB_SOURCE)) {
+			/* pre-v6.11 kernels reject the sb_source request */
+			mask &= ~(uint64_t) STATMOUNT_SB_SOURCE;
+			continue;
+		}
+		if (errno != EOVERFLOW)
+			break;
+		bufsiz *= 2;
+	} while (bufsiz <= (1 << 24));
+
+	free(sm);
+	return -errno;
+}
+
+static int statmount_to_fs(const struct ul_statmount *sm, struct libmnt_fs *fs)
+{
+	int rc = 0;
+
+	/* never leave the source NULL -- fs.c debug helpers and callers
+	 * expect at least the /proc/mounts style "none" placeholder */
+	if (sm->mask & STATMOUNT_SB_SOURCE)
+		rc = mnt_fs_set_source(fs, sm->str + sm->sb_source);
+	else
+		rc = mnt_fs_set_source(fs, "none");
+	if (!rc && (sm->mask & STATMOUNT_MNT_POINT))
+		rc = mnt_fs_set_target(fs, sm->str + sm->mnt_point);
+	if (!rc && (sm->mask & STATMOUNT_MNT_ROOT))
+		rc = mnt_fs_set_root(fs, sm->str + sm->mnt_root);
+	if (!rc && (sm->mask & STATMOUNT_FS_TYPE))
+		rc = mnt_fs_set_fstype(fs, sm->str + sm->fs_type);
+	return rc;
+}
+
+/*
+ * Enumerates mount IDs with listmount() and converts each to a table entry
+ * with statmount(), without going through the /proc/self/mountinfo text
+ * format. Returns -ENOSYS on kernels without the API (< v6.8).
+ */
+static int table_fill_from_kernel(struct libmnt_table *tb)
+{
+	uint64_t ids[512];
+	uint64_t last = 0;
+	ssize_t n;
+	int rc = 0;
+
+	do {
+		ssize_t i;
+
+		n = ul_listmount(LSMT_ROOT, last, ids, ARRAY_SIZE(ids), 0);
+		if (n < 0)
+			return -errno;
+
+		for (i = 0; i < n && rc == 0; i++) {
+			struct ul_statmount *sm = NULL;
+			struct libmnt_fs *fs;
+
+			rc = statmount_fetch(ids[i], &sm);
+			if (rc) {
+				/* the mount may be gone in the meantime */
+				if (rc == -ENOENT) {
+					rc = 0;
+					continue;
+				}
+				break;
+			}
+
+			fs = mnt_new_fs();
+			if (!fs) {
+				free(sm);
+				rc = -ENOMEM;
+				break;
+			}
+			rc = statmount_to_fs(sm, fs);
+			if (!rc)
+				rc = mnt_table_add_fs(tb, fs);
+			mnt_unref_fs(fs);
+			free(sm);
+		}
+		if (n > 0)
+			last = ids[n - 1];
+	} while (rc == 0 && n == (ssize_t) ARRAY_SIZE(ids));
+
+	return rc;
+}
+#endif /* HAVE_STATMOUNT_API */
+
+#define Table_fetch_kernel_HELP "fetch_kernel()\n\n" \
+		"Fills the table with the mount entries of the current namespace\n" \
+		"directly from the kernel via listmount(2)/statmount(2), without\n" \
+		"parsing the /proc/self/mountinfo text format. On kernels without\n" \
+		"these syscalls (< v6.8) the function transparently falls back to\n" \
+		"parsing /proc/self/mountinfo.\n" \
+		"\n" \
+		"Returns self or raises an exception in case of an error."
+static PyObject *Table_fetch_kernel(TableObject *self)
+{
+	int rc = -ENOSYS;
+
+	table_lookup_reset(self);
+#ifdef HAVE_STATMOUNT_API
+	rc = table_fill_from_kernel(self->tab);
+#endif
+	if (rc == -ENOSYS)
+		rc = mnt_table_parse_mtab(self->tab, "/proc/self/mountinfo");
+	return rc ? UL_RaiseExc(-rc) : UL_IncRef(self);
+}
+
 #define Table_add_fs_HELP "add_fs(fs)\n\nAdds a new entry to tab.\n" \
 		"Returns self or raises an exception in case of an error."
 
@@ -444,6 +816,7 @@ static PyObject *Table_add_fs(TableObject *self, PyObject* args, PyObject *kwds)
 		return NULL;
 	}
 	Py_INCREF(fs);
+	table_lookup_reset(self);
 	rc = mnt_table_add_fs(self->tab, fs->fs);
 	return rc ? UL_RaiseExc(-rc) : UL_IncRef(self);
 }
@@ -460,6 +833,7 @@ static PyObject *Table_remove_fs(TableObject *self, PyObject* args, PyObject *kw
 		PyErr_SetString(PyExc_TypeError, ARG_ERR);
 		return NULL;
 	}
+	table_lookup_reset(self);
 	rc = mnt_table_remove_fs(self->tab, fs->fs);
 	Py_DECREF(fs);
 	return rc ? UL_RaiseExc(-rc) : UL_IncRef(self);
@@ -481,7 +855,12 @@ static PyObject *Table_remove_fs(TableObject *self, PyObject* args, PyObject *kw
 		"</programlisting>\n" \
 		"</informalexample>\n" \
 		"\n" \
-		"lists all mountpoints from fstab in backward order."
+		"lists all mountpoints from fstab in backward order.\n" \
+		"\n" \
+		"Note that the returned Fs objects are cached: iterating the same\n" \
+		"table again yields the same objects rather than new allocations.\n" \
+		"Use Tab.next_fs_copy() for entries that have to stay valid after\n" \
+		"the table is modified or re-parsed."
 static PyObject *Table_next_fs(TableObject *self)
 {
 	struct libmnt_fs *fs;
@@ -500,6 +879,211 @@ static PyObject *Table_next_fs(TableObject *self)
 	return PyObjectResultFs(fs);
 }
 
+#define Table_next_fs_copy_HELP "next_fs_copy()\n\n" \
+		"Like Tab.next_fs(), but returns an independent copy of the\n" \
+		"entry. The copy is not connected to the table and survives\n" \
+		"table modification, re-parsing and destruction.\n" \
+		"\n" \
+		"Returns the next Fs on success, raises an exception in case " \
+		"of an error and None at end of list."
+static PyObject *Table_next_fs_copy(TableObject *self)
+{
+	struct libmnt_fs *fs;
+	FsObject *result;
+	int rc;
+
+	rc = mnt_table_next_fs(self->tab, self->iter, &fs);
+	if (rc == 1) {
+		mnt_reset_iter(self->iter, MNT_ITER_FORWARD);
+		Py_RETURN_NONE;
+	}
+
+	if (rc)
+		return UL_RaiseExc(-rc);
+
+	result = PyObject_New(FsObject, &FsType);
+	if (!result)
+		return UL_RaiseExc(ENOMEM);
+
+	result->fs = mnt_copy_fs(NULL, fs);
+	if (!result->fs) {
+		Py_DECREF(result);
+		return UL_RaiseExc(ENOMEM);
+	}
+	mnt_fs_set_userdata(result->fs, result);
+	return (PyObject *) result;
+}
+
+/* Table also supports the iterator protocol, so that
+ *
+ *	for fs in tb:
+ *	    ...
+ *
+ * walks the filesystems without a Python-level method call (and argument
+ * tuple) per entry. Every iter(tb) returns a fresh iterator object with its
+ * own libmnt_iter, so nested and concurrent loops over the same table do
+ * not disturb each other (nor the builtin iterator of Tab.next_fs()).
+ */
+typedef struct {
+	PyObject_HEAD
+
+	TableObject		*table;		/* keeps the table alive */
+	struct libmnt_iter	*iter;
+} TableIterObject;
+
+static void TableIter_destructor(TableIterObject *self)
+{
+	mnt_free_iter(self->iter);
+	Py_XDECREF(self->table);
+	PyFree(self);
+}
+
+static PyObject *TableIter_iternext(TableIterObject *self)
+{
+	struct libmnt_fs *fs;
+	int rc;
+
+	rc = mnt_table_next_fs(self->table->tab, self->iter, &fs);
+	if (rc == 1)
+		return NULL;		/* end of list */
+
+	if (rc)
+		return UL_RaiseExc(-rc);
+
+	return PyObjectResultFs(fs);
+}
+
+static PyTypeObject TableIterType = {
+	PyVarObject_HEAD_INIT(NULL, 0)
+	.tp_name = "libmount.TableIter",
+	.tp_basicsize = sizeof(TableIterObject),
+	.tp_dealloc = (destructor)TableIter_destructor,
+	.tp_flags = Py_TPFLAGS_DEFAULT,
+	.tp_iter = PyObject_SelfIter,
+	.tp_iternext = (iternextfunc)TableIter_iternext,
+};
+
+static PyObject *Table_iter(TableObject *self)
+{
+	TableIterObject *it = PyObject_New(TableIterObject, &TableIterType);
+
+	if (!it)
+		return UL_RaiseExc(ENOMEM);
+
+	it->iter = mnt_new_iter(MNT_ITER_FORWARD);
+	if (!it->iter) {
+		it->table = NULL;
+		Py_DECREF(it);
+		return UL_RaiseExc(ENOMEM);
+	}
+	Py_INCREF(self);
+	it->table = self;
+	return (PyObject *) it;
+}
+
+#define Table_build_index_HELP "build_index()\n\n" \
+		"Builds a hash index over the (source, target) pairs of the\n" \
+		"table, so that subsequent Tab.find_pair() calls with exactly\n" \
+		"matching strings are answered in constant time instead of a\n" \
+		"linear walk. Lookups not covered by the index (e.g. paths that\n" \
+		"match only after canonicalization) transparently fall back to\n" \
+		"the regular search.\n" \
+		"\n" \
+		"Note that among duplicate entries the index prefers the one\n" \
+		"matching by the exact strings: if e.g. \"UUID=x /\" precedes\n" \
+		"\"/dev/sda1 /\", an indexed find_pair(\"/dev/sda1\", \"/\") returns\n" \
+		"the second entry, while the unindexed (canonicalizing) walk\n" \
+		"would return the first. The index is dropped automatically when\n" \
+		"the table is modified.\n" \
+		"\n" \
+		"Returns self or raises an exception in case of an error."
+static PyObject *Table_build_index(TableObject *self)
+{
+	struct pymnt_pairidx *ix;
+	struct libmnt_iter *itr;
+	struct libmnt_fs *fs;
+	size_t cap = 16;
+	int nents = mnt_table_get_nents(self->tab);
+
+	/* keep the load factor below 0.5 */
+	while (cap < (size_t) nents * 2)
+		cap <<= 1;
+
+	ix = calloc(1, sizeof(*ix) + cap * sizeof(ix->slots[0]));
+	if (!ix)
+		return UL_RaiseExc(ENOMEM);
+	ix->cap = cap;
+
+	itr = mnt_new_iter(MNT_ITER_FORWARD);
+	if (!itr) {
+		free(ix);
+		return UL_RaiseExc(ENOMEM);
+	}
+
+	while (mnt_table_next_fs(self->tab, itr, &fs) == 0) {
+		const char *source = mnt_fs_get_source(fs);
+		const char *target = mnt_fs_get_target(fs);
+		struct pymnt_pairent *e;
+
+		if (!source || !target)
+			continue;	/* cannot match by exact strings */
+
+		e = pairidx_slot(ix, source, target);
+		if (!e->first)
+			e->first = fs;
+		e->last = fs;
+	}
+	mnt_free_iter(itr);
+
+	pairidx_free(self);
+	self->pairidx = ix;
+	return UL_IncRef(self);
+}
+
+#define Table_print_debug_all_HELP "print_debug_all()\n\n" \
+		"Formats the debug dump of all entries (the same output as\n" \
+		"Fs.print_debug() per entry) into one buffer and returns it as\n" \
+		"bytes, so a large table can be dumped with a single write\n" \
+		"instead of one Python call and one write per filesystem."
+static PyObject *Table_print_debug_all(TableObject *self)
+{
+	struct libmnt_iter *itr;
+	struct libmnt_fs *fs;
+	PyObject *result;
+	char *buf = NULL;
+	size_t len = 0;
+	FILE *f;
+
+	itr = mnt_new_iter(MNT_ITER_FORWARD);
+	if (!itr)
+		return UL_RaiseExc(ENOMEM);
+
+	f = open_memstream(&buf, &len);
+	if (!f) {
+		mnt_free_iter(itr);
+		return UL_RaiseExc(errno);
+	}
+
+	while (mnt_table_next_fs(self->tab, itr, &fs) == 0)
+		pymnt_fs_print_debug_stream(fs, f);
+
+	mnt_free_iter(itr);
+	if (fclose(f) != 0) {
+		free(buf);
+		return UL_RaiseExc(errno);
+	}
+
+#if PY_MAJOR_VERSION >= 3
+	result = PyBytes_FromStringAndSize(buf, len);
+#else
+	result = PyString_FromStringAndSize(buf, len);
+#endif
+	free(buf);
+	if (!result)
+		PyErr_SetString(PyExc_RuntimeError, CONSTRUCT_ERR);
+	return result;
+}
+
 static PyMethodDef Table_methods[] = {
 	{"enable_comments", (PyCFunction)Table_enable_comments, METH_VARARGS|METH_KEYWORDS, Table_enable_comments_HELP},
 	{"find_pair", (PyCFunction)Table_find_pair, METH_VARARGS|METH_KEYWORDS, Table_find_pair_HELP},
@@ -514,10 +1098,14 @@ static PyMethodDef Table_methods[] = {
 	{"parse_mtab", (PyCFunction)Table_parse_mtab, METH_VARARGS|METH_KEYWORDS, Table_parse_mtab_HELP},
 	{"parse_dir", (PyCFunction)Table_parse_dir, METH_VARARGS|METH_KEYWORDS, Table_parse_dir_HELP},
 	{"parse_swaps", (PyCFunction)Table_parse_swaps, METH_VARARGS|METH_KEYWORDS, Table_parse_swaps_HELP},
+	{"fetch_kernel", (PyCFunction)Table_fetch_kernel, METH_NOARGS, Table_fetch_kernel_HELP},
 	{"is_fs_mounted", (PyCFunction)Table_is_fs_mounted, METH_VARARGS|METH_KEYWORDS, Table_is_fs_mounted_HELP},
 	{"add_fs", (PyCFunction)Table_add_fs, METH_VARARGS|METH_KEYWORDS, Table_add_fs_HELP},
 	{"remove_fs", (PyCFunction)Table_remove_fs, METH_VARARGS|METH_KEYWORDS, Table_remove_fs_HELP},
 	{"next_fs", (PyCFunction)Table_next_fs, METH_NOARGS, Table_next_fs_HELP},
+	{"next_fs_copy", (PyCFunction)Table_next_fs_copy, METH_NOARGS, Table_next_fs_copy_HELP},
+	{"print_debug_all", (PyCFunction)Table_print_debug_all, METH_NOARGS, Table_print_debug_all_HELP},
+	{"build_index", (PyCFunction)Table_build_index, METH_NOARGS, Table_build_index_HELP},
 	{"write_file", (PyCFunction)Table_write_file, METH_VARARGS|METH_KEYWORDS, Table_write_file_HELP},
 	{"replace_file", (PyCFunction)Table_replace_file, METH_VARARGS|METH_KEYWORDS, Table_replace_file_HELP},
 	{NULL}
@@ -553,6 +1141,7 @@ static void Table_destructor(TableObject *self)
 	Table_unref(self->tab);
 	self->tab = NULL;
 
+	table_lookup_reset(self);
 	mnt_free_iter(self->iter);
 	Py_XDECREF(self->errcb);
 	PyFree(self);
@@ -570,6 +1159,9 @@ static PyObject *Table_new(PyTypeObject *type,
 		self->tab = NULL;
 		self->iter = NULL;
 		self->errcb = NULL;
+		memset(self->neg, 0, sizeof(self->neg));
+		self->neg_next = 0;
+		self->pairidx = NULL;
 	}
 	return (PyObject *)self;
 }
@@ -595,6 +1187,7 @@ static int Table_init(TableObject *self, PyObject *args, PyObject *kwds)
 
 	Table_unref(self->tab);
 	self->tab = NULL;
+	table_lookup_reset(self);
 
 	if (self->iter)
 		mnt_reset_iter(self->iter, MNT_ITER_FORWARD);
@@ -635,11 +1228,13 @@ static int Table_init(TableObject *self, PyObject *args, PyObject *kwds)
 	mnt_table_set_parser_errcb(self->tab, pymnt_table_parser_errcb);
 	mnt_table_set_userdata(self->tab, self);
 
-	cache = mnt_new_cache();		/* TODO: make it optional? */
+	/* The tags cache is shared by all tables in the process, so UUID=
+	 * and LABEL= entries don't force re-probing of all block devices
+	 * for every new table.  TODO: make it optional? */
+	cache = pymnt_get_shared_cache();
 	if (!cache)
 		return -1;
 	mnt_table_set_cache(self->tab, cache);
-	mnt_unref_cache(cache);
 
 	return 0;
 }
@@ -707,6 +1302,9 @@ PyObject *PyObjectResultTab(struct libmnt_table *tab)
 	result->iter = mnt_new_iter(MNT_ITER_FORWARD);
 	mnt_table_set_userdata(result->tab, result);
 	result->errcb = NULL;
+	memset(result->neg, 0, sizeof(result->neg));
+	result->neg_next = 0;
+	result->pairidx = NULL;
 	return (PyObject *) result;
 }
 
@@ -737,6 +1335,7 @@ PyTypeObject TableType = {
 	.tp_repr = (reprfunc) Table_repr,
 	.tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE,
 	.tp_doc = Table_HELP,
+	.tp_iter = (getiterfunc)Table_iter,
 	.tp_methods = Table_methods,
 	.tp_members = Table_members,
 	.tp_getset = Table_getseters,
@@ -748,6 +1347,8 @@ void Table_AddModuleObject(PyObject *mod)
 {
 	if (PyType_Ready(&TableType) < 0)
 		return;
+	if (PyType_Ready(&TableIterType) < 0)
+		return;
 
 	DBG(TAB, pymnt_debug("add to module"));
 
@@ -6,43 +6,50 @@ import errno
 # use "import libmount" for in a standard way installed python binding
 import pylibmount as mnt
 
-def usage(tss):
+def usage(tests):
 	print("\nUsage:\n\t{:s} <test> [testoptions]\nTests:\n".format(sys.argv[0]))
-	for i in tss:
-		print("\t{15:-s}".format(i[0]))
-		if i[2] != "":
-			print(" {:s}\n".format(i[2]))
+	for name, (func, help) in tests.items():
+		print("\t{:15s} {:s}".format(name, help))
 
 	print("\n")
 	return 1
 
-def mnt_run_test(tss, argv):
-	rc = -1
-	if ((len(argv) < 2) or (argv[1] == "--help") or (argv[1] == "-h")):
-		return usage(tss)
+def mnt_run_test(tests, argv):
+	if len(argv) < 2 or argv[1] in ("-h", "--help"):
+		return usage(tests)
 
 	#mnt_init_debug(0)
 
-	i=()
-	for i in tss:
-		if i[0] == argv[1]:
-			rc = i[1](i, argv[1:])
-			if rc:
-				print("FAILED [rc={:d}]".format(rc))
-			break
+	test = tests.get(argv[1])
+	if test is None:
+		return usage(tests)
 
-	if ((rc < 0) and (i == ())):
-		return usage(tss)
+	rc = test[0](argv[1:])
+	if rc:
+		print("FAILED [rc={:d}]".format(rc))
 	return not not rc #because !!rc is too mainstream for python
 
-def test_mount(ts, argv):
+_CTX = None
+
+def get_context():
+	# The context is shared by all sub-tests: mnt_new_context() would
+	# otherwise re-read fstab and re-probe tags for every single test,
+	# reset() keeps the cached fstab and the canonicalized paths alive.
+	global _CTX
+	if _CTX is None:
+		_CTX = mnt.Context()
+	else:
+		_CTX.reset()
+	return _CTX
+
+def test_mount(argv):
 	idx = 1
 	rc = 0
 
 	if len(argv) < 2:
 		return -errno.EINVAL
 
-	cxt = mnt.Context()
+	cxt = get_context()
 
 	if argv[idx] == "-o":
 		cxt.options = argv[idx+1]
@@ -67,13 +74,13 @@ def test_mount(ts, argv):
 	print("successfully mounted")
 	return rc
 
-def test_umount(ts, argv):
+def test_umount(argv):
 	idx = 1
 	rc = 0
 	if len(argv) < 2:
 		return -errno.EINVAL
 
-	cxt = mnt.Context()
+	cxt = get_context()
 
 	if argv[idx] == "-t":
 		cxt.options = argv[idx+1]
@@ -102,12 +109,12 @@ def test_umount(ts, argv):
 	print("successfully umounted")
 	return rc
 
-def test_flags(ts, argv):
+def test_flags(argv):
 	idx = 1
 	rc = 0
 	opt = ""
 	flags = 0
-	cxt = mnt.Context()
+	cxt = get_context()
 
 	if argv[idx] == "-o":
 		cxt.options = argv[idx + 1]
@@ -124,16 +131,16 @@ def test_flags(ts, argv):
 
 	opt = cxt.fs.options
 	if (opt):
-		print("options: {:s}", opt)
+		print("options: {:s}".format(opt))
 
-	print("flags: {08:lx}".format(cxt.mflags()))
+	print("flags: {:08x}".format(cxt.mflags))
 	return rc
 
-def test_mountall(ts, argv):
+def test_mountall(argv):
 	mntrc = 1
 	ignored = 1
 	idx = 1
-	cxt = mnt.Context()
+	cxt = get_context()
 
 	if len(argv) > 2:
 		if argv[idx] == "-O":
@@ -143,9 +150,8 @@ def test_mountall(ts, argv):
 			cxt.fstype_pattern = argv[idx+1]
 			idx += 2
 
-	i = ()
 	while (cxt.next_mount()):
-		tgt = i.target
+		tgt = cxt.fs.target
 		if (ignored == 1):
 			print("{:s}: ignored: not match".format(tgt))
 		elif (ignored == 2):
@@ -162,12 +168,12 @@ def test_mountall(ts, argv):
 	return 0
 
 
-tss = (
-	( "--mount",  test_mount,  "[-o <opts>] [-t <type>] <spec>|<src> <target>" ),
-	( "--umount", test_umount, "[-t <type>] [-f][-l][-r] <src>|<target>" ),
-	( "--mount-all", test_mountall,  "[-O <pattern>] [-t <pattern] mount all filesystems from fstab" ),
-	( "--flags", test_flags,   "[-o <opts>] <spec>" )
-)
+TESTS = {
+	"--mount":     (test_mount,    "[-o <opts>] [-t <type>] <spec>|<src> <target>"),
+	"--umount":    (test_umount,   "[-t <type>] [-f][-l][-r] <src>|<target>"),
+	"--mount-all": (test_mountall, "[-O <pattern>] [-t <pattern] mount all filesystems from fstab"),
+	"--flags":     (test_flags,    "[-o <opts>] <spec>"),
+}
 os.umask(stat.S_IWGRP | stat.S_IWOTH) #to be compatible with mount(8)
 
-sys.exit(mnt_run_test(tss, sys.argv))
+sys.exit(mnt_run_test(TESTS, sys.argv))
@@ -2,38 +2,31 @@ import os
 import sys
 import stat
 import errno
-import functools as ft
 
 # use "import libmount" for in a standard way installed python binding
 import pylibmount as mnt
 
-def usage(tss):
+def usage(tests):
 	print("\nUsage:\n\t{:s} <test> [testoptions]\nTests:\n".format(sys.argv[0]))
-	for i in tss:
-		print("\t{15:-s}".format(i[0]))
-		if i[2] != "":
-			print(" {:s}\n".format(i[2]))
+	for name, (func, help) in tests.items():
+		print("\t{:15s} {:s}".format(name, help))
 
 	print("\n")
 	return 1
 
-def mnt_run_test(tss, argv):
-	rc = -1
-	if ((len(argv) < 2) or (argv[1] == "--help") or (argv[1] == "-h")):
-		return usage(tss)
+def mnt_run_test(tests, argv):
+	if len(argv) < 2 or argv[1] in ("-h", "--help"):
+		return usage(tests)
 
 	#mnt_init_debug(0)
 
-	i=()
-	for i in tss:
-		if i[0] == argv[1]:
-			rc = i[1](i, argv[1:])
-			if rc:
-				print("FAILED [rc={:d}]".format(rc))
-			break
+	test = tests.get(argv[1])
+	if test is None:
+		return usage(tests)
 
-	if ((rc < 0) and (i == ())):
-		return usage(tss)
+	rc = test[0](argv[1:])
+	if rc:
+		print("FAILED [rc={:d}]".format(rc))
 	return not not rc #because !!rc is too mainstream for python
 
 def parser_errcb(tb, fname, line):
@@ -49,13 +42,13 @@ def create_table(f, comments):
 	tb.errcb = parser_errcb
 
 	try:
-		tb.parse_file(f)
+		tb.parse_file(f, use_mmap=True)
 	except Exception:
 		print("{:s}: parsing failed".format(f))
 		return None
 	return tb
 
-def test_copy_fs(ts, argv):
+def test_copy_fs(argv):
 	rc = -1
 	tb = create_table(argv[1], False)
 	fs = tb.find_target("/", mnt.MNT_ITER_FORWARD)
@@ -72,7 +65,7 @@ def test_copy_fs(ts, argv):
 	fs.print_debug()
 	return 0
 
-def test_parse(ts, argv):
+def test_parse(argv):
 	parse_comments = False
 
 	if len(argv) == 3 and argv[2] == "--comments":
@@ -82,13 +75,14 @@ def test_parse(ts, argv):
 	if tb.intro_comment:
 		print("Initial comment:\n\"{:s}\"".format(tb.intro_comment))
 	#while ((fs = tb.next_fs()) != None):
-	for fs in iter(ft.partial(tb.next_fs), None):
-		fs.print_debug()
+	sys.stdout.flush()
+	sys.stdout.buffer.write(tb.print_debug_all())
+	sys.stdout.flush()
 	if tb.trailing_comment:
 		print("Trailing comment:\n\"{:s}\"".format(tb.trailing_comment))
 	return 0
 
-def test_find(ts, argv, dr):
+def test_find(argv, dr):
 	if len(argv) != 4:
 		print("try --help")
 		return -errno.EINVAL
@@ -107,42 +101,43 @@ def test_find(ts, argv, dr):
 		fs.print_debug()
 	return 0
 
-def test_find_fw(ts, argv):
-	return test_find(ts, argv, mnt.MNT_ITER_FORWARD)
+def test_find_fw(argv):
+	return test_find(argv, mnt.MNT_ITER_FORWARD)
 
-def test_find_bw(ts, argv):
-	return test_find(ts, argv, mnt.MNT_ITER_BACKWARD)
+def test_find_bw(argv):
+	return test_find(argv, mnt.MNT_ITER_BACKWARD)
 
-def test_find_pair(ts, argv):
+def test_find_pair(argv):
 	rc = -1
 	tb = create_table(argv[1], False)
+	tb.build_index()
 	fs = tb.find_pair(argv[2], argv[3], mnt.MNT_ITER_FORWARD)
 	if not fs:
 		return rc
 	fs.print_debug()
 	return 0
 
-def test_is_mounted(ts, argv):
+def test_is_mounted(argv):
 	rc = -1
-	tb = mnt.Tab(path="/proc/self/mountinfo")
+	tb = mnt.Table(path="/proc/self/mountinfo")
 	if not tb:
-		print("failed to parse mountinto")
+		print("failed to parse mountinfo")
 		return rc
 
 	fstab = create_table(argv[1], False)
 	if not fstab:
 		return rc
-	fs = ()
-	for fs in ft.iter(tb.next_fs(), -1):
+	for fs in fstab:
 		if tb.is_fs_mounted(fs):
 			print("{:s} already mounted on {:s}".format(fs.source, fs.target))
 		else:
 			print("{:s} not mounted on {:s}".format(fs.source, fs.target))
 	return 0
 
-def test_find_mountpoint(ts, argv):
+def test_find_mountpoint(argv):
 	rc = -1
-	tb = mnt.Table("/proc/self/mountinfo")
+	tb = mnt.Table()
+	tb.fetch_kernel()
 	if not tb:
 		return rc
 	fs = tb.find_mountpoint(argv[1], mnt.MNT_ITER_BACKWARD)
@@ -152,13 +147,13 @@ def test_find_mountpoint(ts, argv):
 	return 0
 
 
-tss = (
-	( "--parse",    test_parse,        "<file> [--comments] parse and print(tab" ),
-	( "--find-forward",  test_find_fw, "<file> <source|target> <string>" ),
-	( "--find-backward", test_find_bw, "<file> <source|target> <string>" ),
-	( "--find-pair",     test_find_pair, "<file> <source> <target>" ),
-	( "--find-mountpoint", test_find_mountpoint, "<path>" ),
-	( "--copy-fs",       test_copy_fs, "<file>  copy root FS from the file" ),
-	( "--is-mounted",    test_is_mounted, "<fstab> check what from <file> are already mounted" ),
-)
-sys.exit(mnt_run_test(tss, sys.argv))
+TESTS = {
+	"--parse":           (test_parse,           "<file> [--comments] parse and print tab"),
+	"--find-forward":    (test_find_fw,         "<file> <source|target> <string>"),
+	"--find-backward":   (test_find_bw,         "<file> <source|target> <string>"),
+	"--find-pair":       (test_find_pair,       "<file> <source> <target>"),
+	"--find-mountpoint": (test_find_mountpoint, "<path>"),
+	"--copy-fs":         (test_copy_fs,         "<file>  copy root FS from the file"),
+	"--is-mounted":      (test_is_mounted,      "<fstab> check what from <file> are already mounted"),
+}
+sys.exit(mnt_run_test(TESTS, sys.argv))
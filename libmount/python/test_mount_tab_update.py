@@ -6,36 +6,30 @@ import errno
 # use "import libmount" for in a standard way installed python binding
 import pylibmount as mnt
 
-def usage(tss):
+def usage(tests):
 	print("\nUsage:\n\t{:s} <test> [testoptions]\nTests:\n".format(sys.argv[0]))
-	for i in tss:
-		print("\t{15:-s}".format(i[0]))
-		if i[2] != "":
-			print(" {:s}\n".format(i[2]))
+	for name, (func, help) in tests.items():
+		print("\t{:15s} {:s}".format(name, help))
 
 	print("\n")
 	return 1
 
-def mnt_run_test(tss, argv):
-	rc = -1
-	if ((len(argv) < 2) or (argv[1] == "--help") or (argv[1] == "-h")):
-		return usage(tss)
+def mnt_run_test(tests, argv):
+	if len(argv) < 2 or argv[1] in ("-h", "--help"):
+		return usage(tests)
 
 	#mnt_init_debug(0)
 
-	i=()
-	for i in tss:
-		if i[0] == argv[1]:
-			rc = i[1](i, argv[1:])
-			if rc:
-				print("FAILED [rc={:d}]".format(rc))
-			break
+	test = tests.get(argv[1])
+	if test is None:
+		return usage(tests)
 
-	if ((rc < 0) and (i == ())):
-		return usage(tss)
+	rc = test[0](argv[1:])
+	if rc:
+		print("FAILED [rc={:d}]".format(rc))
 	return not not rc #because !!rc is too mainstream for python
 
-def test_replace(ts, argv):
+def test_replace(argv):
 	fs = mnt.Fs()
 	tb = mnt.Table()
 
@@ -52,8 +46,8 @@ def test_replace(ts, argv):
 	tb.replace_file(os.environ["LIBMOUNT_FSTAB"])
 	return 0
 
-tss = (
-	( "--replace",test_replace, "<src> <target>                Add a line to LIBMOUNT_FSTAB and replace the original file" ),
-)
+TESTS = {
+	"--replace": (test_replace, "<src> <target>                Add a line to LIBMOUNT_FSTAB and replace the original file"),
+}
 
-sys.exit(mnt_run_test(tss, sys.argv))
+sys.exit(mnt_run_test(TESTS, sys.argv))
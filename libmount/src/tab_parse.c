@@ -82,18 +82,17 @@ static const char *next_u64(const char *s, uint64_t *num, int *rc)
 	return end;
 }
 
+/* strspn() and strcspn() scan several bytes per iteration (SIMD in glibc),
+ * the field-by-field parsing of large mountinfo files is measurably faster
+ * than with byte-at-a-time loops */
 static inline const char *skip_separator(const char *p)
 {
-	while (p && (*p == ' ' || *p == '\t'))
-		++p;
-	return p;
+	return p ? p + strspn(p, " \t") : NULL;
 }
 
 static inline const char *skip_nonspearator(const char *p)
 {
-	while (p && *p && !(*p == ' ' || *p == '\t'))
-		p++;
-	return p;
+	return p ? p + strcspn(p, " \t") : NULL;
 }
 
 /*